@@ -14,19 +14,28 @@
 # TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 # SOFTWARE.
 
+# numpy, torch, PIL, websockets, and ComfyUI's server are imported where they are first used, not here. This module is
+# imported while ComfyUI starts, and should cost almost nothing until a transceiver node is placed or a client connects.
+from __future__ import annotations
+
 import asyncio
+import concurrent.futures
 import json
 import hashlib
-import numpy as np
-import time
-import torch
-from PIL import Image, ImageOps
+import os
+import tempfile
+import threading
 from io import BytesIO
-from server import PromptServer  # noqa
-from torch import Tensor
-from typing import Dict
-from websockets import serve, WebSocketServer, WebSocketServerProtocol
+from typing import TYPE_CHECKING, Callable, Dict, List
+from image_transceiver.utilities.frame_utils import DEFAULT_FRAME_BUDGET, FrameArrays, decode_frames, frame_arrays_of
 from image_transceiver.utilities.html_utils import *
+from image_transceiver.utilities.session_log import MessageType, SessionRecorder, new_log_name
+from image_transceiver.utilities.timing_utils import StageTimings
+
+if TYPE_CHECKING:
+    from PIL import Image
+    from torch import Tensor
+    from websockets import WebSocketServer, WebSocketServerProtocol
 
 TRANSCEIVER_NODE_LOGGER: logging.Logger = logging.getLogger("ImageTransceiver")
 TRANSCEIVER_NODE_LOGGER_FORMAT: str = "[%(filename)s:%(lineno)s - %(funcName)20s() ] %(message)s"
@@ -40,6 +49,30 @@ ch.setFormatter(formatter)
 TRANSCEIVER_NODE_LOGGER.propagate = False
 TRANSCEIVER_NODE_LOGGER.addHandler(ch)
 TRANSCEIVER_MSG_KEY = "TRANSCEIVER_MSG"
+# Session logs are only ever written here, under generated names. See ImageTransceiverCore.start_recording()
+SESSION_LOG_SUBDIR = "image_transceiver_sessions"
+# Routes on the ComfyUI server. Clients poll the status route until the transceiver server is ready.
+TRANSCEIVER_STATUS_ROUTE = "/image_transceiver/status"
+TRANSCEIVER_START_ROUTE = "/image_transceiver/start"
+TRANSCEIVER_TIMINGS_ROUTE = "/image_transceiver/timings"
+
+
+def _comfy_loop() -> asyncio.AbstractEventLoop:
+    # ComfyUI runs its event loop on the main thread, while nodes execute on a worker thread.
+    try:
+        return asyncio.get_running_loop()
+    except RuntimeError:
+        from server import PromptServer  # noqa
+        return PromptServer.instance.loop
+
+
+def _session_log_dir() -> str:
+    try:
+        import folder_paths  # noqa
+        parent_dir: str = folder_paths.get_output_directory()
+    except ImportError:  # Not running in ComfyUI, for example while replaying a session log.
+        parent_dir = tempfile.gettempdir()
+    return os.path.join(parent_dir, SESSION_LOG_SUBDIR)
 
 
 def _is_json(maybe_json):
@@ -57,6 +90,15 @@ class ServerOperation(Enum):
     REPORT = auto()
 
 
+class ServerState(Enum):
+    """
+    Reported by the status route. Keep in sync with any client that polls it.
+    """
+    STOPPED = "stopped"
+    STARTING = "starting"
+    READY = "ready"
+
+
 class ControllerCommand(Enum):
     """
     Commands for the Transceiver_Controller. Often, will be forwarded to ComfyUI.
@@ -66,6 +108,7 @@ class ControllerCommand(Enum):
     ATTENTION = "command"
     CONFIG = "config"
     ENQUEUE_PROMPT = "enqueue_prompt"
+    REPORT = "report"
     ABORT_WORKFLOW = "abort_workflow"
 
 
@@ -80,14 +123,29 @@ class PayloadType(Enum):
 class ImageTransceiverCore:
     # No connections can send messages exceeding the max_size parameter.
     MAX_MEMORY_USAGE = 1_073_741_824  # bytes. 1gb
+    # While restarting, the previous server can still hold the port for a moment.
+    BIND_ATTEMPTS = 8
+    BIND_RETRY_DELAY = 0.25  # seconds
 
     def __init__(self):
         TRANSCEIVER_NODE_LOGGER.setLevel(level=logging.DEBUG)
         TRANSCEIVER_NODE_LOGGER.warning(f"{self.__class__.__name__} Constructor")
-        self._image_field: Image = Image.new("RGB", (1, 1), (255, 255, 255))
+        self._image_field: Image | None = None  # A blank placeholder is created on first use, see image_pil
+        self._image_bytes: bytes | None = None  # The undecoded container behind image_pil, for multi-frame decoding.
+        # The last result of decoded_frames(), and the image bytes and frame selection it was decoded from.
+        self._decoded_source: bytes | None = None
+        self._decoded_selection: tuple[int, int, int, int] | None = None
+        self._decoded: List[FrameArrays] = []
         self._transceiver_port: int = 8765
         self._server_future: asyncio.Future | None = None
+        self._server_lock: threading.Lock = threading.Lock()  # Guards _server_future. START comes from two threads.
+        self._server_error: str | None = None  # Why the last server run ended, if it failed.
+        self._ws_server: WebSocketServer | None = None  # Assigned once the server is listening.
         self._future_result: asyncio.Future | None = None
+        self._session_recorder: SessionRecorder | None = None  # Opt-in. See start_recording()
+        self._relay_sink: Callable[[str, Dict[str, str]], None] | None = None  # None relays to the PromptServer.
+        self._stage_timings: StageTimings = StageTimings()
+        self._replay_mode: bool = False
 
     @property
     def transceiver_port(self) -> int:
@@ -99,6 +157,9 @@ class ImageTransceiverCore:
 
     @property
     def image_pil(self) -> Image:
+        if self._image_field is None:
+            from PIL import Image
+            self._image_field = Image.new("RGB", (1, 1), (255, 255, 255))
         return self._image_field
 
     @image_pil.setter
@@ -109,15 +170,140 @@ class ImageTransceiverCore:
         assignment_msg: str = f"Assigned PIL image to transceiver core."
         TRANSCEIVER_NODE_LOGGER.warning(assignment_msg)
 
+    @property
+    def image_bytes(self) -> bytes | None:
+        return self._image_bytes
+
+    def decoded_frames(self, start: int, stop: int, stride: int, frame_budget: int) -> List[FrameArrays]:
+        """
+        The selected frames of the latest image, decoded by frame_utils.decode_frames. The result is reused until a new
+        image arrives or the selection changes, so re-running a workflow does not decode the same image again.
+        """
+        image_bytes: bytes | None = self._image_bytes
+        if image_bytes is None:
+            return []
+        selection: tuple[int, int, int, int] = (start, stop, stride, frame_budget)
+        if image_bytes is not self._decoded_source or selection != self._decoded_selection:
+            self._decoded = decode_frames(image_bytes=image_bytes,
+                                          start=start,
+                                          stop=stop,
+                                          stride=stride,
+                                          frame_budget=frame_budget)
+            self._decoded_source = image_bytes
+            self._decoded_selection = selection
+        return self._decoded
+
+    @property
+    def server_state(self) -> ServerState:
+        if self._server_future is None or self._server_future.done():
+            return ServerState.STOPPED
+        if self._ws_server is None:
+            return ServerState.STARTING
+        return ServerState.READY
+
+    def status(self) -> Dict[str, str | int]:
+        status: Dict[str, str | int] = {"state": self.server_state.value, "port": self._transceiver_port}
+        if self._server_error is not None:
+            status["error"] = self._server_error
+        return status
+
+    @property
+    def stage_timings(self) -> StageTimings:
+        return self._stage_timings
+
+    @property
+    def relay_sink(self) -> Callable[[str, Dict[str, str]], None] | None:
+        return self._relay_sink
+
+    @relay_sink.setter
+    def relay_sink(self, sink: Callable[[str, Dict[str, str]], None] | None):
+        """
+        Replaces PromptServer.instance.send_sync as the destination of relayed messages. Used when replaying a session
+        without a browser. Assign None to relay to the PromptServer again.
+        """
+        self._relay_sink = sink
+
+    @property
+    def replay_mode(self) -> bool:
+        return self._replay_mode
+
+    @replay_mode.setter
+    def replay_mode(self, replaying: bool):
+        """
+        While replaying a session log, the recorded "port" and "record" config changes are ignored, so a benchmark
+        neither restarts a server nor writes new session logs.
+        """
+        self._replay_mode = replaying
+
+    @property
+    def session_recorder(self) -> SessionRecorder | None:
+        return self._session_recorder
+
+    def start_recording(self) -> str:
+        """
+        Appends every incoming message to a new session log, until stop_recording() is invoked. Clients can turn
+        recording on and off, but can never choose where the log is written. It is always a generated name in the
+        "image_transceiver_sessions" directory of ComfyUI's output directory.
+        Returns
+        -------
+        The path of the new session log.
+        """
+        self.stop_recording()
+        log_dir: str = _session_log_dir()
+        os.makedirs(log_dir, exist_ok=True)
+        log_path: str = os.path.join(log_dir, new_log_name())
+        self._session_recorder = SessionRecorder(log_path=log_path)
+        TRANSCEIVER_NODE_LOGGER.warning(f"Recording incoming messages to \"{log_path}\"")
+        return log_path
+
+    def stop_recording(self):
+        if self._session_recorder is not None:
+            TRANSCEIVER_NODE_LOGGER.warning(f"Stopped recording to \"{self._session_recorder.log_path}\"")
+            self._session_recorder.close()
+            self._session_recorder = None
+
+    def _send_to_comfy(self, sabot: Dict[str, str]):
+        with self._stage_timings.measure("relay"):
+            if self._relay_sink is not None:
+                self._relay_sink(TRANSCEIVER_MSG_KEY, sabot)
+            else:
+                from server import PromptServer  # noqa
+                PromptServer.instance.send_sync(TRANSCEIVER_MSG_KEY, sabot)
+
+    def dispatch_msg(self, incoming_message: str):
+        """
+        Records, when recording, then handles one message from a client. Both live connections and replayed session
+        logs come through here, so their stage timings are comparable. While recording, "total" includes the "record"
+        stage, so compare a replay's "total" with the live "total" minus "record".
+        """
+        with self._stage_timings.measure("total"):
+            with self._stage_timings.measure("classify"):
+                is_json = _is_json(maybe_json=incoming_message)
+            if self._session_recorder is not None:
+                with self._stage_timings.measure("record"):
+                    self._session_recorder.record(message_type=MessageType.JSON if is_json else MessageType.IMAGE,
+                                                  payload=incoming_message)
+            with self._stage_timings.measure("handle"):
+                if is_json:
+                    self.handle_json_msg(json_text=incoming_message)
+                else:
+                    self.handle_image_msg(img_base64_str=incoming_message)
+
     def handle_image_msg(self, img_base64_str: str):
         TRANSCEIVER_NODE_LOGGER.debug(f"incoming_image string={img_base64_str[:32]}... ")
-        src_attribute: str = image_b64_str_to_attribute(img_base64_str=img_base64_str)
+        with self._stage_timings.measure("decode"):
+            image_bytes: bytes = base64.b64decode(img_base64_str)
+            image_format: ImageFormat = image_format_of(image_bytes)
+            src_attribute: str = image_b64_str_to_attribute(img_base64_str=img_base64_str, image_format=image_format)
         image_sabot: Dict[str, str] = {PayloadType.PICT_CHA.value: src_attribute}
 
         # json_str: str = json.dumps(obj=image_sabot, indent=4, sort_keys=True)
         # TRANSCEIVER_NODE_LOGGER.warning(json_str)
-        PromptServer.instance.send_sync(TRANSCEIVER_MSG_KEY, image_sabot)
-        pil_image: Image = Image.open(BytesIO(base64.b64decode(img_base64_str)))
+        self._send_to_comfy(image_sabot)
+        # Image.open only reads the header. Pixels, and any further frames, are decoded when the workflow flows.
+        from PIL import Image  # Outside the timed block, so the first image does not include the import.
+        with self._stage_timings.measure("open"):
+            pil_image: Image = Image.open(BytesIO(image_bytes))
         image_description_msg: str = f"Created PIL image from incoming_image:"
         f" format={pil_image.format};"
         f" size={pil_image.size};"
@@ -125,6 +311,7 @@ class ImageTransceiverCore:
         f" info={pil_image.info}"
         TRANSCEIVER_NODE_LOGGER.debug(image_description_msg)
         self.image_pil = pil_image
+        self._image_bytes = image_bytes
 
     def handle_json_msg(self, json_text: str):
         TRANSCEIVER_NODE_LOGGER.debug(f"incoming json_text... \n ${json_text}")
@@ -134,10 +321,21 @@ class ImageTransceiverCore:
         command: ControllerCommand = ControllerCommand(command_str)
         dirty: bool = False
         match command:
+            case ControllerCommand.CONFIG if self._replay_mode:
+                TRANSCEIVER_NODE_LOGGER.debug("Replaying, so port and record changes are ignored.")
             case ControllerCommand.CONFIG:
                 if "port" in parsed_message:
                     dirty = True
                     self.transceiver_port = parsed_message["port"]
+                if "record" in parsed_message:
+                    # Only true or false. The location of the log is never taken from a client.
+                    if not isinstance(parsed_message["record"], bool):
+                        raise ValueError(f"\"record\" must be true or false, not {parsed_message['record']!r}")
+                    if parsed_message["record"]:
+                        if self._session_recorder is None:  # Already recording keeps the same log.
+                            self.start_recording()
+                    else:
+                        self.stop_recording()
                 if dirty:
                     self.server_control(ServerOperation.RESTART)
             case ControllerCommand.ENQUEUE_PROMPT:
@@ -145,7 +343,9 @@ class ImageTransceiverCore:
                 cmd_sabot: Dict[str, str] = {PayloadType.COMFYUI_CMD.value: command.value}
                 sabot_text: str = json.dumps(obj=cmd_sabot, indent=4, sort_keys=True)
                 TRANSCEIVER_NODE_LOGGER.warning(sabot_text)
-                PromptServer.instance.send_sync(TRANSCEIVER_MSG_KEY, cmd_sabot)
+                self._send_to_comfy(cmd_sabot)
+            case ControllerCommand.REPORT:
+                self.server_control(ServerOperation.REPORT)
             case _:
                 raise NotImplemented(f"Unsupported command \"{command}\"")
 
@@ -153,19 +353,19 @@ class ImageTransceiverCore:
         TRANSCEIVER_NODE_LOGGER.warning(f"server_control; Operation {operation}")
         match operation:
             case ServerOperation.STOP:
-                if self._server_future is not None:
-                    self._server_future.cancel("Stopped")
-                    self._server_future = None
+                with self._server_lock:
+                    self._cancel_server_future()
             case ServerOperation.START:
-                self._run_server_coroutine()
-            case ServerOperation.RESTART:
-                if self._server_future is not None:
-                    self._server_future.cancel("Stopped")
-                    self._server_future = None
-                    time.sleep(0.25)
+                with self._server_lock:
                     self._run_server_coroutine()
+            case ServerOperation.RESTART:
+                with self._server_lock:
+                    if self._server_future is not None:
+                        self._cancel_server_future()
+                        self._run_server_coroutine()  # _run_server waits for the port to be released.
             case ServerOperation.REPORT:
-                pass
+                TRANSCEIVER_NODE_LOGGER.warning(f"Server {self.server_state.value} on port {self._transceiver_port}")
+                TRANSCEIVER_NODE_LOGGER.warning(f"Stage timings:\n{self._stage_timings.report()}")
             case _:
                 raise NotImplemented(f"Unsupported operation {operation}")
 
@@ -176,11 +376,7 @@ class ImageTransceiverCore:
         try:  # Getting and sending messages can raise exceptions
             async for incoming_message in client_websocket:
                 try:  # processing the message can raise exceptions.
-                    is_json = _is_json(maybe_json=incoming_message)
-                    if is_json:
-                        self.handle_json_msg(json_text=incoming_message)
-                    else:
-                        self.handle_image_msg(img_base64_str=incoming_message)
+                    self.dispatch_msg(incoming_message=incoming_message)
                 except Exception as ex_err1:
                     TRANSCEIVER_NODE_LOGGER.exception(ex_err1)
                 outgoing_message: str = f"Sent a {TRANSCEIVER_MSG_KEY} json string to ComfyServer."
@@ -191,26 +387,63 @@ class ImageTransceiverCore:
 
     async def _run_server(self):
         TRANSCEIVER_NODE_LOGGER.info("_run_server invoked")
-        ws_server: WebSocketServer
-        # No connections can send messages exceeding the max_size parameter.
-        async with serve(ws_handler=self._relay_to_comfy,
-                         host="localhost",
-                         port=self._transceiver_port,
-                         max_size=ImageTransceiverCore.MAX_MEMORY_USAGE,
-                         logger=TRANSCEIVER_NODE_LOGGER) as ws_server:
-            TRANSCEIVER_NODE_LOGGER.info("server obtained, waiting for close ...")
-            await ws_server.wait_closed()
+        from websockets import serve
+        ws_server: WebSocketServer | None = None
+        try:
+            for attempt in range(1, ImageTransceiverCore.BIND_ATTEMPTS + 1):
+                try:
+                    # No connections can send messages exceeding the max_size parameter.
+                    async with serve(ws_handler=self._relay_to_comfy,
+                                     host="localhost",
+                                     port=self._transceiver_port,
+                                     max_size=ImageTransceiverCore.MAX_MEMORY_USAGE,
+                                     logger=TRANSCEIVER_NODE_LOGGER) as ws_server:
+                        TRANSCEIVER_NODE_LOGGER.info("server obtained, waiting for close ...")
+                        self._ws_server = ws_server
+                        await ws_server.wait_closed()
+                    return
+                except OSError as os_error:
+                    if ws_server is not None or attempt == ImageTransceiverCore.BIND_ATTEMPTS:
+                        raise
+                    TRANSCEIVER_NODE_LOGGER.warning(f"Port {self._transceiver_port} unavailable, retrying: {os_error}")
+                    await asyncio.sleep(ImageTransceiverCore.BIND_RETRY_DELAY)
+        finally:
+            # A restart may already have replaced this server with a new one.
+            if ws_server is not None and self._ws_server is ws_server:
+                self._ws_server = None
+
+    def _on_server_done(self, server_future: concurrent.futures.Future):
+        # Without this, an exception from _run_server, such as a port that never came free, would only be stored in
+        # the future, and never seen.
+        if server_future.cancelled():
+            return
+        server_exception: BaseException | None = server_future.exception()
+        if server_exception is not None:
+            self._server_error = f"{type(server_exception).__name__}: {server_exception}"
+            TRANSCEIVER_NODE_LOGGER.error("Transceiver server failed.", exc_info=server_exception)
+
+    def _cancel_server_future(self):
+        # The caller must hold _server_lock.
+        if self._server_future is not None:
+            self._server_future.cancel()
+            self._server_future = None
 
     def _run_server_coroutine(self):
+        """
+        Schedules the server on ComfyUI's event loop and returns immediately. Poll server_state to know when the
+        server is listening. The caller must hold _server_lock.
+        """
         TRANSCEIVER_NODE_LOGGER.info("_run_server_coroutine invoked")
-        if self._server_future is not None:
-            TRANSCEIVER_NODE_LOGGER.warning("Transceiver server is already running.")
+        if self._server_future is not None and not self._server_future.done():
+            TRANSCEIVER_NODE_LOGGER.info("Transceiver server is already running.")
             return
         try:
-            this_loop = asyncio.get_running_loop()
-            self._server_future = asyncio.run_coroutine_threadsafe(self._run_server(), this_loop)
-            time.sleep(0.25)
-        except RuntimeError as r_error:
+            self._ws_server = None
+            self._server_error = None
+            self._server_future = asyncio.run_coroutine_threadsafe(self._run_server(), _comfy_loop())
+            self._server_future.add_done_callback(self._on_server_done)
+        except (ImportError, AttributeError, RuntimeError) as r_error:
+            self._server_error = f"{type(r_error).__name__}: {r_error}"
             TRANSCEIVER_NODE_LOGGER.exception(r_error)
 
 
@@ -260,10 +493,23 @@ class ImageTransceiver:
     # Consider the categories "real-time", "live" or "client-server"
     CATEGORY = "image"  # "image" is an existing category in ComfyUI. Nodes can make their own categories too.
 
-    TRANSCEIVER_CORE: ImageTransceiverCore = ImageTransceiverCore()
+    _TRANSCEIVER_CORE: ImageTransceiverCore | None = None
+    _TRANSCEIVER_CORE_LOCK: threading.Lock = threading.Lock()
+
+    @classmethod
+    def transceiver_core(cls) -> ImageTransceiverCore:
+        """
+        The single ImageTransceiverCore, constructed on first use rather than when ComfyUI imports this module.
+        """
+        if ImageTransceiver._TRANSCEIVER_CORE is None:
+            with ImageTransceiver._TRANSCEIVER_CORE_LOCK:
+                if ImageTransceiver._TRANSCEIVER_CORE is None:
+                    ImageTransceiver._TRANSCEIVER_CORE = ImageTransceiverCore()
+        return ImageTransceiver._TRANSCEIVER_CORE
 
     @classmethod
-    def IS_CHANGED(cls, print_to_stream, node_id):  # noqa
+    def IS_CHANGED(cls, print_to_stream, node_id,  # noqa
+                   frame_start=0, frame_stop=0, frame_stride=1, frame_budget=DEFAULT_FRAME_BUDGET):
         """
             The node will always be re-executed if any of the inputs change but
             this method can be used to force the node to execute again even when the inputs don't change.
@@ -274,8 +520,12 @@ class ImageTransceiver:
         """
         TRANSCEIVER_NODE_LOGGER.info(f"{cls.__name__} IS_CHANGED() invoked.")  # So far, I have not seen this invoked.
         hash_val: str = "A020988"  # 42. Google it.
-        if ImageTransceiver.TRANSCEIVER_CORE.image_pil is not None:
-            pil_image: Image = ImageTransceiver.TRANSCEIVER_CORE.image_pil
+        if ImageTransceiver.transceiver_core().image_bytes is not None:
+            # Hashing the container covers every frame, and does not decode any of them.
+            image_hasher = hashlib.sha256(ImageTransceiver.transceiver_core().image_bytes)
+            hash_val = image_hasher.hexdigest()
+        elif ImageTransceiver.transceiver_core().image_pil is not None:
+            pil_image: Image = ImageTransceiver.transceiver_core().image_pil
             image_bytes: bytes = pil_image.tobytes()
             image_hasher = hashlib.sha256(image_bytes)
             hash_val = image_hasher.hexdigest()
@@ -299,12 +549,20 @@ class ImageTransceiver:
                         + Second value is a config for type "INT", "STRING" or "FLOAT".
         """
         TRANSCEIVER_NODE_LOGGER.info(f"{cls.__name__} INPUT_TYPES() invoked.")
-        TRANSCEIVER_NODE_LOGGER.info("Calling server_control.")
-        ImageTransceiver.TRANSCEIVER_CORE.server_control(ServerOperation.START)
+        # The server is NOT started here. ComfyUI calls INPUT_TYPES for every node while it starts. The frontend
+        # starts the server through TRANSCEIVER_START_ROUTE when a transceiver node is placed, and flow_image starts it
+        # if it is still stopped.
         return {
             "required": {
                 "print_to_stream": (["enable", "disable"],),
             },
+            # Only used when the client sends an animated APNG, GIF, or WebP. Still images are always one frame.
+            "optional": {
+                "frame_start": ("INT", {"default": 0, "min": 0, "max": 0xffff}),
+                "frame_stop": ("INT", {"default": 0, "min": 0, "max": 0xffff}),  # 0 means "through the last frame"
+                "frame_stride": ("INT", {"default": 1, "min": 1, "max": 0xffff}),
+                "frame_budget": ("INT", {"default": DEFAULT_FRAME_BUDGET, "min": 1, "max": 4096}),
+            },
             "hidden": {"node_id": "UNIQUE_ID"},  # Add the hidden key
         }
 
@@ -334,29 +592,74 @@ class ImageTransceiver:
         self._mask_tensor = mask_tensor_arg
 
     # noinspection PyMethodMayBeStatic
-    def flow_image(self, print_to_stream, node_id) -> tuple[Tensor, Tensor]:
+    def flow_image(self, print_to_stream, node_id,
+                   frame_start=0, frame_stop=0, frame_stride=1, frame_budget=DEFAULT_FRAME_BUDGET
+                   ) -> tuple[Tensor, Tensor]:
         message: str = f"""Your input contains:
                 node_id: {node_id}
+                frames: start={frame_start} stop={frame_stop} stride={frame_stride} budget={frame_budget}
             """
         TRANSCEIVER_NODE_LOGGER.info(message)
         if print_to_stream == "enable":
             print(message)
+        import numpy as np
+        import torch
+        if ImageTransceiver.transceiver_core().server_state == ServerState.STOPPED:
+            ImageTransceiver.transceiver_core().server_control(ServerOperation.START)
         # Refactored from https://www.comfydocs.org/essentials/custom_node_images_and_masks
         #  and
         #  <projects>/ComfyUI/nodes.py method load_image(self, image) lines 1513-1519
         # Less reuse of identifiers, and I added type hints.
-        image_pil: Image = ImageOps.exif_transpose(ImageTransceiver.TRANSCEIVER_CORE.image_pil)  # Can be None
-        if image_pil is not None:
-            if image_pil.mode == 'I':
-                image_pil = image_pil.point(lambda i: i * (1 / 255))
-            image_pil_converted: Image = image_pil.convert("RGB")
-            image_np_array = np.array(image_pil_converted).astype(np.float32) / 255.0
-            image_tensor: Tensor = torch.from_numpy(image_np_array)[None,]
+        # The frame handling is in utilities/frame_utils.py, and batches frames like load_image does.
+        frames: List[FrameArrays] = []
+        if ImageTransceiver.transceiver_core().image_bytes is not None:
+            frames = ImageTransceiver.transceiver_core().decoded_frames(start=frame_start,
+                                                                        stop=frame_stop,
+                                                                        stride=frame_stride,
+                                                                        frame_budget=frame_budget)
+        elif ImageTransceiver.transceiver_core().image_pil is not None:
+            frames = [frame_arrays_of(ImageTransceiver.transceiver_core().image_pil)]
+        if frames:
+            image_tensor: Tensor = torch.from_numpy(np.stack([image_np for image_np, _ in frames]))  # [B,H,W,C]
             self.image_tensor = image_tensor
-            if 'A' in image_pil.getbands():
-                mask = np.array(image_pil.getchannel('A')).astype(np.float32) / 255.0
-                mask = 1. - torch.from_numpy(mask)
+            if all(mask_np is None for _, mask_np in frames):
+                mask = torch.zeros((len(frames), 64, 64), dtype=torch.float32, device="cpu")
             else:
-                mask = torch.zeros((64, 64), dtype=torch.float32, device="cpu")
-            self.mask_tensor = mask.unsqueeze(0)
+                height, width = image_tensor.shape[1:3]
+                mask = torch.from_numpy(np.stack([mask_np if mask_np is not None
+                                                  else np.zeros((height, width), dtype=np.float32)
+                                                  for _, mask_np in frames]))
+            self.mask_tensor = mask
         return self.image_tensor, self.mask_tensor
+
+
+def register_routes():
+    """
+    Adds the status, start and timings routes to the ComfyUI server. When there is no ComfyUI server, for example while
+    replaying a session log, there are no routes to add.
+    """
+    try:
+        from aiohttp import web
+        from server import PromptServer  # noqa
+    except ImportError as import_error:
+        TRANSCEIVER_NODE_LOGGER.info(f"No ComfyUI server, so no routes: {import_error}")
+        return
+    if getattr(PromptServer, "instance", None) is None:
+        TRANSCEIVER_NODE_LOGGER.info("No ComfyUI server instance, so no routes.")
+        return
+
+    @PromptServer.instance.routes.get(TRANSCEIVER_STATUS_ROUTE)
+    async def transceiver_status(request):  # noqa
+        return web.json_response(ImageTransceiver.transceiver_core().status())
+
+    @PromptServer.instance.routes.post(TRANSCEIVER_START_ROUTE)
+    async def transceiver_start(request):  # noqa
+        ImageTransceiver.transceiver_core().server_control(ServerOperation.START)
+        return web.json_response(ImageTransceiver.transceiver_core().status())
+
+    @PromptServer.instance.routes.get(TRANSCEIVER_TIMINGS_ROUTE)
+    async def transceiver_timings(request):  # noqa
+        return web.json_response(ImageTransceiver.transceiver_core().stage_timings.summary())
+
+
+register_routes()
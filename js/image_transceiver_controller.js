@@ -82,6 +82,8 @@ class ImageTransceiverController {
 
   /** @type {string} */
   static TRANSCEIVER_MSG_KEY = "TRANSCEIVER_MSG";
+  /** @type {string} Keep in sync with TRANSCEIVER_START_ROUTE in image_transceiver.py */
+  static TRANSCEIVER_START_ROUTE = "/image_transceiver/start";
  /** @type {string} The version of this class. Synchronize with value in __init__.py and in gimp_comfyui.py */
   static VERSION = "0.7.11"
 
@@ -324,6 +326,21 @@ class ImageTransceiverController {
     console.log(`Received: ${dataReceived}`);
   }
 
+  /**
+   * Asks ComfyUI to start the transceiver server. The server is not started until a transceiver node is placed, so
+   *  ComfyUI starts quickly when the node is not used. Starting an already running server does nothing.
+   */
+  startTransceiverServer() {
+    api.fetchApi(ImageTransceiverController.TRANSCEIVER_START_ROUTE, { method: "POST" })
+      .then((resp) => resp.json())
+      .then((status) => {
+        console.debug(`Transceiver server is ${status.state} on port ${status.port}`);
+      })
+      .catch((err) => {
+        console.error(err);
+      });
+  }
+
   initNodeImage() {
     // console.debug("initNodeImage()")
     /* This  section will run once, loading the "No Image" image ... */
@@ -559,6 +576,8 @@ app.registerExtension(
         else {
           console.error("IMAGE_TRANSCEIVER_CONTROLLER.transceiverViewNode previously set.");
         }
+        // Every time, because the backend may have restarted since. Starting a running server does nothing.
+        IMAGE_TRANSCEIVER_CONTROLLER.startTransceiverServer();
       }
     },
     /**
@@ -576,6 +595,16 @@ app.registerExtension(
         ImageTransceiverController.TRANSCEIVER_MSG_KEY,
         IMAGE_TRANSCEIVER_CONTROLLER.handleTransceiverMessage.bind(IMAGE_TRANSCEIVER_CONTROLLER)
       );
+      /*
+       * When ComfyUI restarts with this page still open, the page reconnects without recreating its nodes, so
+       * nodeCreated is not invoked again. Restart the transceiver server only if the graph still has the node.
+       * transceiverViewNode is no help here, because it is never cleared when the node is removed.
+       */
+      api.addEventListener("reconnected", () => {
+        if (app.graph.findNodesByType("ImageTransceiver").length > 0) {
+          IMAGE_TRANSCEIVER_CONTROLLER.startTransceiverServer();
+        }
+      });
 
       /**
        * This call "registers" renderTransceiverViewNode as the animation frame provider for this page. In this case,
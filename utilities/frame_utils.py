@@ -0,0 +1,155 @@
+#  Copyright (c) 2024. Charles Hymes
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+# documentation files (the “Software”), to deal in the Software without restriction, including without limitation the
+# rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software,
+# and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all copies or substantial portions of
+# the Software.
+#
+# THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO
+# THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT,
+# TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+from __future__ import annotations
+
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+from typing import TYPE_CHECKING, List, Tuple
+
+if TYPE_CHECKING:  # Imported where they are used, so importing this module stays cheap.
+    import numpy as np
+    from PIL import Image
+
+# The most frames that will be decoded from one message, unless the caller asks for a different budget.
+DEFAULT_FRAME_BUDGET = 64
+DEFAULT_DECODE_WORKERS = min(4, os.cpu_count() or 1)
+
+# (image array [H,W,3] float32 in 0..1, mask array [H,W] float32 in 0..1, or None when the frame has no alpha)
+FrameArrays = Tuple["np.ndarray", "np.ndarray | None"]
+
+
+def frame_count_of(image_bytes: bytes) -> int:
+    """
+    Counts the frames in an image container without decoding their pixels.
+    Parameters
+    ----------
+    image_bytes The raw bytes of an image, NOT base64 encoded.
+    Returns
+    -------
+    The number of frames. Single frame formats return 1.
+    """
+    from PIL import Image
+    with Image.open(BytesIO(image_bytes)) as image_pil:
+        return getattr(image_pil, "n_frames", 1)
+
+
+def select_frame_indices(frame_count: int,
+                         start: int = 0,
+                         stop: int = 0,
+                         stride: int = 1,
+                         frame_budget: int = DEFAULT_FRAME_BUDGET) -> List[int]:
+    """
+    Chooses which frames of an animation to decode.
+    Parameters
+    ----------
+    frame_count The number of frames in the container.
+    start Index of the first frame, clamped to the last frame.
+    stop Index one past the last frame. Zero or less means "through the last frame".
+    stride Step between selected frames. Values less than 1 are treated as 1.
+    frame_budget The most frames that may be selected. Frames beyond the budget are dropped.
+    Returns
+    -------
+    The ascending list of selected frame indices. Never empty when frame_count is positive.
+    """
+    if frame_count < 1:
+        return []
+    first: int = min(max(start, 0), frame_count - 1)
+    last: int = frame_count if stop <= 0 else min(stop, frame_count)
+    indices: List[int] = list(range(first, max(last, first + 1), max(stride, 1)))
+    if len(indices) > frame_budget:
+        logging.warning(f"Selected {len(indices)} frames, but the frame budget is {frame_budget}. Dropping the rest.")
+        indices = indices[:max(frame_budget, 1)]
+    return indices
+
+
+def frame_arrays_of(image_pil: Image) -> FrameArrays:
+    """
+    Converts one PIL frame into the arrays ComfyUI expects, as in ComfyUI's LoadImage node.
+    Parameters
+    ----------
+    image_pil The frame to convert. It is not modified.
+    Returns
+    -------
+    A tuple of the RGB image array, and the inverted alpha mask array or None if the frame has no alpha band.
+    """
+    import numpy as np
+    from PIL import ImageOps
+    frame_pil: Image = ImageOps.exif_transpose(image_pil)
+    if frame_pil.mode == 'I':
+        frame_pil = frame_pil.point(lambda i: i * (1 / 255))
+    image_np_array = np.array(frame_pil.convert("RGB")).astype(np.float32) / 255.0
+    mask_np_array: np.ndarray | None = None
+    if 'A' in frame_pil.getbands():
+        mask_np_array = 1. - np.array(frame_pil.getchannel('A')).astype(np.float32) / 255.0
+    return image_np_array, mask_np_array
+
+
+def decode_frames(image_bytes: bytes,
+                  start: int = 0,
+                  stop: int = 0,
+                  stride: int = 1,
+                  frame_budget: int = DEFAULT_FRAME_BUDGET,
+                  workers: int = DEFAULT_DECODE_WORKERS) -> List[FrameArrays]:
+    """
+    Decodes the selected frames of an APNG, GIF, or WebP animation. Still images are decoded as a single frame.
+    Only the selected frames are converted, and no more than frame_budget of them are kept. The budget caps the number
+    of frames, not the memory they use, which is about 16 * width * height bytes per frame with its mask.
+    Pillow can only decode GIF, APNG and WebP frames in order, so the frames are decoded once, in a single pass on this
+    thread. Each selected frame is copied, and its conversion into arrays runs in parallel on the workers.
+    Parameters
+    ----------
+    image_bytes The raw bytes of an image, NOT base64 encoded.
+    start Index of the first frame.
+    stop Index one past the last frame. Zero or less means "through the last frame".
+    stride Step between selected frames.
+    frame_budget The most frames to decode. A count, not a number of bytes.
+    workers The most threads to decode with.
+    Returns
+    -------
+    The arrays of the selected frames, in frame order. Frames whose size differs from the first frame are dropped.
+    """
+    from PIL import Image
+    decoded: List[FrameArrays]
+    with Image.open(BytesIO(image_bytes)) as image_pil:
+        indices: List[int] = select_frame_indices(frame_count=getattr(image_pil, "n_frames", 1),
+                                                  start=start,
+                                                  stop=stop,
+                                                  stride=stride,
+                                                  frame_budget=frame_budget)
+        if len(indices) == 1 or workers <= 1:
+            decoded = []
+            for index in indices:
+                image_pil.seek(index)
+                decoded.append(frame_arrays_of(image_pil))
+        else:
+            with ThreadPoolExecutor(max_workers=min(workers, len(indices)),
+                                    thread_name_prefix="frame_converter") as executor:
+                conversions = []
+                for index in indices:
+                    image_pil.seek(index)  # The indices ascend, so this only advances from the previous frame.
+                    conversions.append(executor.submit(frame_arrays_of, image_pil.copy()))
+                decoded = [conversion.result() for conversion in conversions]
+    if not decoded:
+        return decoded
+    first_shape = decoded[0][0].shape
+    matching: List[FrameArrays] = [frame for frame in decoded if frame[0].shape == first_shape]
+    if len(matching) < len(decoded):
+        logging.warning(f"Dropped {len(decoded) - len(matching)} frames"
+                        f" that were not {first_shape[1]}x{first_shape[0]}.")
+    return matching
@@ -18,6 +18,7 @@
 import base64
 import logging
 import os
+import struct
 import sys
 import tempfile
 from enum import Enum, auto
@@ -43,10 +44,20 @@ class ImageFormat(Enum):
     SVG = auto()
     WebP = auto()
 
+    @property
+    def mime_subtype(self) -> str:
+        # Most subtypes are just the lowered name, the exceptions are registered under other names.
+        match self:
+            case ImageFormat.ICO:
+                return "x-icon"
+            case ImageFormat.SVG:
+                return "svg+xml"
+            case _:
+                return self.name.lower()
+
     @property
     def attribute_prefix(self) -> str:
-        lowered = self.name.lower()
-        return f"data:image/{lowered};base64, "
+        return f"data:image/{self.mime_subtype};base64, "
 
 
 class SrcAttributeExample(Enum):
@@ -56,6 +67,48 @@ class SrcAttributeExample(Enum):
     MAGIC_LAMP = auto()
 
 
+def _png_is_animated(image_bytes: bytes) -> bool:
+    # An APNG is a PNG with an "acTL" chunk somewhere before the first "IDAT" chunk.
+    offset: int = 8
+    while offset + 8 <= len(image_bytes):
+        chunk_length, chunk_type = struct.unpack(">I4s", image_bytes[offset:offset + 8])
+        if chunk_type == b"acTL":
+            return True
+        if chunk_type in (b"IDAT", b"IEND"):
+            return False
+        offset += 12 + chunk_length  # length, type, data, crc
+    return False
+
+
+def image_format_of(image_bytes: bytes) -> ImageFormat:
+    """
+    Sniffs the format of an image from the magic numbers at the start of its (decoded) bytes.
+    Parameters
+    ----------
+    image_bytes The raw bytes of an image, NOT base64 encoded.
+    Returns
+    -------
+    The ImageFormat of the image. Defaults to ImageFormat.PNG when the format is not recognized.
+    """
+    if image_bytes.startswith(b"\x89PNG\r\n\x1a\n"):
+        return ImageFormat.APNG if _png_is_animated(image_bytes) else ImageFormat.PNG
+    if image_bytes[:6] in (b"GIF87a", b"GIF89a"):
+        return ImageFormat.GIF
+    if image_bytes[:4] == b"RIFF" and image_bytes[8:12] == b"WEBP":
+        return ImageFormat.WebP
+    if image_bytes.startswith(b"\xff\xd8\xff"):
+        return ImageFormat.JPEG
+    if image_bytes.startswith(b"BM"):
+        return ImageFormat.BMP
+    if image_bytes.startswith(b"\x00\x00\x01\x00"):
+        return ImageFormat.ICO
+    if image_bytes[4:12] in (b"ftypavif", b"ftypavis"):
+        return ImageFormat.AVIF
+    if image_bytes.lstrip()[:5] in (b"<?xml", b"<svg "):
+        return ImageFormat.SVG
+    return ImageFormat.PNG
+
+
 def image_b64_str_to_attribute(img_base64_str: str, image_format: ImageFormat = ImageFormat.PNG) -> str:
     """
     Converts the base64 encoded string of an image into the src attribute for an img tag.
@@ -0,0 +1,237 @@
+#  Copyright (c) 2024. Charles Hymes
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+# documentation files (the “Software”), to deal in the Software without restriction, including without limitation the
+# rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software,
+# and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all copies or substantial portions of
+# the Software.
+#
+# THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO
+# THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT,
+# TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+"""
+Records the messages a transceiver receives, and replays them later.
+
+A session log is two append-only files. The log file holds one record per message, a fixed size header followed by the
+payload. Images are stored as the bytes behind their base64 text, a quarter smaller, and other messages as utf-8
+text. The index file holds one fixed size entry per record, so a reader can find any record without scanning the log.
+Both are read through mmap.
+"""
+import argparse
+import base64
+import binascii
+import logging
+import mmap
+import os
+import struct
+import sys
+import time
+import uuid
+from enum import Enum
+from typing import Callable, Iterator, NamedTuple
+
+LOG_MAGIC = b"ITLOG\x00\x02\x00"  # Name, then format version.
+INDEX_SUFFIX = ".index"
+# timestamp (seconds since the epoch), message type, payload length
+_RECORD_HEADER = struct.Struct("<dBI")
+# record offset in the log file, timestamp, message type, payload length
+_INDEX_ENTRY = struct.Struct("<QdBI")
+
+
+class MessageType(Enum):
+    IMAGE = 1  # Stored decoded, replayed as base64 text.
+    JSON = 2
+    TEXT = 3  # A message that was neither json nor valid base64, stored as it came.
+
+
+class SessionRecord(NamedTuple):
+    timestamp: float
+    message_type: MessageType
+    payload: str
+
+
+class ReplayResult(NamedTuple):
+    replayed: int
+    failed: int
+
+
+def index_path_of(log_path: str) -> str:
+    return f"{log_path}{INDEX_SUFFIX}"
+
+
+def new_log_name() -> str:
+    """A new, unique file name for a session log. Never contains a path separator."""
+    return f"session_{time.strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:8]}.itlog"
+
+
+class SessionRecorder:
+    """
+    Appends messages to a session log. Each record is flushed as it is written, so the log is usable even if ComfyUI
+    is killed mid-session. Recording runs on the thread that handles messages, which for a live session is ComfyUI's
+    event loop thread. So each record costs the loop a base64 decode of an image, two writes, and two flushes to the OS.
+    There is no fsync, so the flushes do not wait for the disk.
+    """
+
+    def __init__(self, log_path: str):
+        self._log_path: str = log_path
+        self._log_file = open(log_path, "ab")
+        self._index_file = open(index_path_of(log_path), "ab")
+        if self._log_file.tell() == 0:
+            self._log_file.write(LOG_MAGIC)
+            self._log_file.flush()
+        logging.info(f"Recording session to \"{log_path}\"")
+
+    @property
+    def log_path(self) -> str:
+        return self._log_path
+
+    def record(self, message_type: MessageType, payload: str, timestamp: float | None = None):
+        payload_bytes: bytes
+        if message_type == MessageType.IMAGE:
+            try:
+                payload_bytes = base64.b64decode(payload, validate=True)
+            except binascii.Error:  # Kept exactly as received, so the replay fails the way the live session did.
+                message_type = MessageType.TEXT
+                payload_bytes = payload.encode(encoding="utf-8")
+        else:
+            payload_bytes = payload.encode(encoding="utf-8")
+        when: float = time.time() if timestamp is None else timestamp
+        offset: int = self._log_file.tell()
+        self._log_file.write(_RECORD_HEADER.pack(when, message_type.value, len(payload_bytes)))
+        self._log_file.write(payload_bytes)
+        self._log_file.flush()
+        # The index entry is written last, so a reader never sees an entry for a partial record.
+        self._index_file.write(_INDEX_ENTRY.pack(offset, when, message_type.value, len(payload_bytes)))
+        self._index_file.flush()
+
+    def close(self):
+        self._index_file.close()
+        self._log_file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+class SessionLogReader:
+    """
+    Random access to the records of a session log, through memory-mapped views of the log and index files.
+    """
+
+    def __init__(self, log_path: str):
+        self._log_file = open(log_path, "rb")
+        self._index_file = open(index_path_of(log_path), "rb")
+        self._log_map: mmap.mmap | None = None
+        self._index_map: mmap.mmap | None = None
+        if os.fstat(self._log_file.fileno()).st_size > 0:
+            self._log_map = mmap.mmap(self._log_file.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._log_map is None or self._log_map[:len(LOG_MAGIC)] != LOG_MAGIC:
+            self.close()
+            raise ValueError(f"\"{log_path}\" is not a session log.")
+        index_size: int = os.fstat(self._index_file.fileno()).st_size
+        if index_size > 0:
+            self._index_map = mmap.mmap(self._index_file.fileno(), 0, access=mmap.ACCESS_READ)
+        # A trailing partial entry, from a recorder that was killed mid-write, is ignored.
+        self._count: int = index_size // _INDEX_ENTRY.size
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __getitem__(self, item: int) -> SessionRecord:
+        if item < 0:
+            item += self._count
+        if not 0 <= item < self._count:
+            raise IndexError(f"Record {item} is not in a log of {self._count} records.")
+        offset, timestamp, type_value, length = _INDEX_ENTRY.unpack_from(self._index_map, item * _INDEX_ENTRY.size)
+        payload_start: int = offset + _RECORD_HEADER.size
+        message_type: MessageType = MessageType(type_value)
+        payload_bytes: bytes = self._log_map[payload_start:payload_start + length]
+        if message_type == MessageType.IMAGE:
+            payload: str = base64.b64encode(payload_bytes).decode(encoding="ascii")
+        else:
+            payload = payload_bytes.decode(encoding="utf-8")
+        return SessionRecord(timestamp=timestamp, message_type=message_type, payload=payload)
+
+    def __iter__(self) -> Iterator[SessionRecord]:
+        for item in range(self._count):
+            yield self[item]
+
+    def close(self):
+        if self._index_map is not None:
+            self._index_map.close()
+        if self._log_map is not None:
+            self._log_map.close()
+        self._index_file.close()
+        self._log_file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+def replay_session(log_path: str, dispatch: Callable[[str], None], speed: float = 1.0) -> ReplayResult:
+    """
+    Feeds the messages of a session log to dispatch, in the order they were recorded. As on a live connection, a message
+    that raises is logged, and the replay continues. When dispatch is ImageTransceiverCore.dispatch_msg, set replay_mode
+    on that core first, so recorded config changes do not restart servers or start new recordings.
+    Parameters
+    ----------
+    log_path The path of the log file. The index file must be beside it.
+    dispatch Called with the text of each message, usually ImageTransceiverCore.dispatch_msg
+    speed 1.0 keeps the recorded gaps between messages, 2.0 halves them, and 0 or less sends them as fast as possible.
+    Returns
+    -------
+    The number of messages replayed, and how many of them raised.
+    """
+    replayed: int = 0
+    failed: int = 0
+    with SessionLogReader(log_path) as reader:
+        if len(reader) == 0:
+            return ReplayResult(replayed=replayed, failed=failed)
+        first_timestamp: float = reader[0].timestamp
+        started: float = time.perf_counter()
+        for record in reader:
+            if speed > 0:
+                delay: float = (record.timestamp - first_timestamp) / speed - (time.perf_counter() - started)
+                if delay > 0:
+                    time.sleep(delay)
+            try:
+                dispatch(record.payload)
+            except Exception as ex_err:
+                failed += 1
+                logging.exception(ex_err)
+            replayed += 1
+    return ReplayResult(replayed=replayed, failed=failed)
+
+
+def main() -> int:
+    """
+    Replays a session log into a new ImageTransceiverCore, then prints the per-stage timings. Run it from the ComfyUI
+    directory, with the custom_nodes directory on PYTHONPATH, so the transceiver can be imported.
+    """
+    parser = argparse.ArgumentParser(description="Replay an image_transceiver session log as a benchmark.")
+    parser.add_argument("log_path", help="The session log file. Its index file must be beside it.")
+    parser.add_argument("--speed", type=float, default=1.0,
+                        help="1 is the recorded speed, 2 is twice as fast, 0 is as fast as possible.")
+    args = parser.parse_args()
+    from image_transceiver.image_transceiver import ImageTransceiverCore  # noqa
+    core = ImageTransceiverCore()
+    core.relay_sink = lambda msg_key, payload: None  # There is no browser to relay to.
+    core.replay_mode = True
+    result: ReplayResult = replay_session(log_path=args.log_path, dispatch=core.dispatch_msg, speed=args.speed)
+    print(f"Replayed {result.replayed} messages from \"{args.log_path}\", {result.failed} of them failed.")
+    print(core.stage_timings.report())
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
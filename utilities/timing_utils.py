@@ -0,0 +1,78 @@
+#  Copyright (c) 2024. Charles Hymes
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+# documentation files (the “Software”), to deal in the Software without restriction, including without limitation the
+# rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software,
+# and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all copies or substantial portions of
+# the Software.
+#
+# THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO
+# THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT,
+# TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Deque, Dict, Iterator, List
+
+# Only the most recent samples of each stage are kept, so a long session cannot grow without bound.
+MAX_SAMPLES_PER_STAGE = 4096
+
+
+class StageTimings:
+    """
+    Collects how long each named stage of message handling takes.
+    """
+
+    def __init__(self, max_samples: int = MAX_SAMPLES_PER_STAGE):
+        self._max_samples: int = max_samples
+        self._samples: Dict[str, Deque[float]] = {}
+
+    @contextmanager
+    def measure(self, stage: str) -> Iterator[None]:
+        """
+        Times the body of a with statement, and records the duration under stage. Exceptions are timed too.
+        """
+        started: float = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(stage=stage, seconds=time.perf_counter() - started)
+
+    def add(self, stage: str, seconds: float):
+        if stage not in self._samples:
+            self._samples[stage] = deque(maxlen=self._max_samples)
+        self._samples[stage].append(seconds)
+
+    def clear(self):
+        self._samples.clear()
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """
+        Returns
+        -------
+        For each stage, in the order the stages were first seen, the count, mean, p50, p95 and max in milliseconds.
+        """
+        stats: Dict[str, Dict[str, float]] = {}
+        for stage, samples in self._samples.items():
+            ordered: List[float] = sorted(samples)
+            count: int = len(ordered)
+            stats[stage] = {
+                "count": count,
+                "mean_ms": 1000.0 * sum(ordered) / count,
+                "p50_ms": 1000.0 * ordered[(count - 1) // 2],
+                "p95_ms": 1000.0 * ordered[min(count - 1, int(0.95 * count))],
+                "max_ms": 1000.0 * ordered[-1],
+            }
+        return stats
+
+    def report(self) -> str:
+        lines: List[str] = [f"{'stage':<16}{'count':>8}{'mean_ms':>12}{'p50_ms':>12}{'p95_ms':>12}{'max_ms':>12}"]
+        for stage, stats in self.summary().items():
+            lines.append(f"{stage:<16}{stats['count']:>8}{stats['mean_ms']:>12.3f}{stats['p50_ms']:>12.3f}"
+                         f"{stats['p95_ms']:>12.3f}{stats['max_ms']:>12.3f}")
+        return "\n".join(lines)